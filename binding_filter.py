@@ -0,0 +1,123 @@
+import time
+
+# --- Default thresholds ---
+# An axis binding presses once its value reaches "press" and only releases
+# after falling below "release"; the gap between them absorbs resting noise.
+# A change also has to hold for "min_hold" seconds before it is committed,
+# which filters out single-tick glitches.
+AXIS_THRESHOLDS = {"press": 0.5, "release": 0.35, "min_hold": 0.02}
+BUTTON_THRESHOLDS = {"press": 0.5, "release": 0.5, "min_hold": 0.0}
+
+
+def make_binding(thresholds, defaults, **binding):
+    """
+    Precomputes a binding state dict from per-binding threshold overrides.
+    Extra keyword arguments are stored on the binding as-is.
+    """
+    press = float(thresholds.get("press", defaults["press"]))
+    release = float(thresholds.get("release", defaults["release"]))
+    if release > press:
+        raise ValueError(f"release threshold {release} is above press threshold {press}")
+    binding.update({
+        "press": press,
+        "release": release,
+        "min_hold": float(thresholds.get("min_hold", defaults["min_hold"])),
+        "pressed": False,
+        "pending_since": None,
+    })
+    return binding
+
+
+def update_binding(binding, value, now):
+    """
+    Feeds one sample into the binding, returns True if its pressed state changed.
+    """
+    if binding["pressed"]:
+        target = value >= binding["release"]
+    else:
+        target = value > binding["press"]
+    if target == binding["pressed"]:
+        binding["pending_since"] = None
+        return False
+    if binding["pending_since"] is None:
+        binding["pending_since"] = now
+    if now - binding["pending_since"] < binding["min_hold"]:
+        return False
+    binding["pressed"] = target
+    binding["pending_since"] = None
+    return True
+
+
+def binding_key(value):
+    # mark11 bindings are either a plain key name or a dict with threshold overrides
+    if isinstance(value, dict):
+        return value.get("key", "?")
+    return value if isinstance(value, str) else repr(value)
+
+
+def build_bindings(mappings, output):
+    """
+    Precomputes mark11's "axis:<idx>:<polarity>" / "button:<idx>" mappings,
+    skipping malformed ones and keys the output backend cannot send.
+    """
+    bindings = []
+    for input_id, value in mappings.items():
+        parts = input_id.split(":")
+        input_type = parts[0]
+        if input_type not in ("axis", "button"):
+            continue
+        try:
+            # Hand-edited dict bindings may lack "key" or hold non-numeric thresholds
+            if isinstance(value, str):
+                key, thresholds = value, {}
+            else:
+                key, thresholds = value["key"], value
+            if not key.startswith("mouse:") and not output.supports(key):
+                print("Skipping binding:", input_id, f"{output.name} output cannot send {key!r}")
+                continue
+            bindings.append(make_binding(
+                thresholds,
+                AXIS_THRESHOLDS if input_type == "axis" else BUTTON_THRESHOLDS,
+                input_id=input_id, key=key, type=input_type, idx=int(parts[1]),
+                polarity=int(parts[2]) if input_type == "axis" else 1,
+            ))
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            print("Skipping binding:", input_id, repr(e))
+    return bindings
+
+
+def binding_value(binding, js):
+    """
+    Reads a binding's input, with axis polarity applied so "pressed" is always positive.
+    """
+    if binding["type"] == "axis":
+        return js.get_axis(binding["idx"]) * binding["polarity"]
+    return js.get_button(binding["idx"])
+
+
+class EventRate:
+    """
+    Counts injected events and keeps a per-second rate, updated by tick().
+    """
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.reset()
+
+    def reset(self, now=None):
+        self.count = 0
+        self.rate = 0.0
+        self.started = time.monotonic() if now is None else now
+
+    def add(self, n=1):
+        self.count += n
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started
+        if elapsed < self.window:
+            return False
+        self.rate = self.count / elapsed
+        self.count = 0
+        self.started = now
+        return True
@@ -5,7 +5,8 @@ import threading
 import pygame
 import tkinter as tk
 from tkinter import messagebox, ttk
-from pynput.mouse import Controller as MouseController, Button
+from output_backends import SIDE_BUTTONS, open_backend
+from binding_filter import AXIS_THRESHOLDS, BUTTON_THRESHOLDS, EventRate, make_binding, update_binding
 
 # --- Constants ---
 CONFIG_FILE = "controller_mapping_config.json"
@@ -21,14 +22,24 @@ CALIBRATION_STEPS = [
 	("Hold X (Mouse 3)",      "button_x1", None),
 	("Hold Y (Mouse 4)",      "button_x2", None),
 ]
+BUTTON_BINDINGS = [
+	('left_trigger_click', "mouse_button:left"),
+	('right_trigger_click', "mouse_button:right"),
+	('button_x1', SIDE_BUTTONS[0]),
+	('button_x2', SIDE_BUTTONS[1]),
+]
+# Triggers rest at -1 and press through 0, so centre the band on 0
+TRIGGER_THRESHOLDS = dict(AXIS_THRESHOLDS, press=0.1, release=-0.1)
 
 # --- Application State ---
 state = {
 	"joystick": None,
-	"mouse": None,
+	"mouse": None,  # output backend from output_backends.open_backend()
 	"control_map": {},
 	"is_running": False,
 	"polling_thread": None,
+	"thresholds": {},  # { "control_key": {"press": ..., "release": ..., "min_hold": ...} }
+	"event_rate": EventRate(),  # injected events per second
 	# GUI vars will be set in build_ui
 }
 last_scroll_time = 0
@@ -41,6 +52,7 @@ def load_configuration():
 		with open(CONFIG_FILE, 'r') as f:
 			data = json.load(f)
 		state['control_map'] = {k: tuple(v) for k, v in data.get('control_map', {}).items()}
+		state['thresholds'] = data.get('thresholds', {})
 		state['mouse_speed_var'].set(data.get('mouse_speed', 10))
 		state['scroll_speed_var'].set(data.get('scroll_speed', 5))
 		state['scroll_clicks_per'].set(data.get('scroll_clicks_per', 0.2))
@@ -53,6 +65,7 @@ def load_configuration():
 def save_configuration():
 	data = {
 		'control_map': state['control_map'],
+		'thresholds': state['thresholds'],
 		'mouse_speed': state['mouse_speed_var'].get(),
 		'scroll_speed': state['scroll_speed_var'].get(),
 		'scroll_clicks_per': state['scroll_clicks_per'].get(),
@@ -155,6 +168,7 @@ def process_mouse_movement(js, mouse):
 			dx = int(x * state['mouse_speed_var'].get())
 			dy = int(y * state['mouse_speed_var'].get())
 			mouse.move(dx, dy)
+			state['event_rate'].add()
 	except KeyError:
 		pass
 
@@ -174,40 +188,59 @@ def process_scroll(js, mouse):
 		
 		direction = -state["scroll_clicks_per"].get() * -raw if raw < 0 else state["scroll_clicks_per"].get() * raw
 		mouse.scroll(0, direction)
+		state['event_rate'].add()
 			
 	except KeyError:
 		pass
 
-def process_button_presses(js, mouse, prev_states):
+def build_button_bindings():
 	"""
-	Processes button and trigger presses into mouse click/release events.
+	Precomputes hysteresis state for each calibrated button and trigger.
 	"""
 	cm = state['control_map']
-	for key, btn in [
-		('left_trigger_click', Button.left),
-		('right_trigger_click', Button.right),
-		('button_x1', Button.x1),
-		('button_x2', Button.x2),
-	]:
+	bindings = []
+	for key, btn in BUTTON_BINDINGS:
 		if key not in cm:
 			continue
 		idx, pol = cm[key]
-		raw = (js.get_axis(idx) * pol
-			   if key.endswith('_click') else
-			   (1 if js.get_button(idx) else 0))
-		pressed = raw > 0
-		if pressed and not prev_states.get(key, False):
-			mouse.press(btn)
-		elif not pressed and prev_states.get(key, False):
-			mouse.release(btn)
-		prev_states[key] = pressed
+		is_trigger = key.endswith('_click')
+		if not state['mouse'].supports(btn):
+			print("Skipping binding:", key, f"{state['mouse'].name} output cannot send {btn!r}")
+			continue
+		try:
+			bindings.append(make_binding(
+				state['thresholds'].get(key, {}),
+				TRIGGER_THRESHOLDS if is_trigger else BUTTON_THRESHOLDS,
+				btn=btn, idx=idx, pol=pol, is_trigger=is_trigger))
+		except (AttributeError, TypeError, ValueError) as e:
+			print("Skipping binding:", key, repr(e))
+	return bindings
+
+def process_button_presses(js, mouse, bindings):
+	"""
+	Processes button and trigger presses into mouse click/release events.
+	"""
+	now = time.monotonic()
+	for binding in bindings:
+		raw = (js.get_axis(binding['idx']) * binding['pol']
+			   if binding['is_trigger'] else
+			   (1 if js.get_button(binding['idx']) else 0))
+		if not update_binding(binding, raw, now):
+			continue
+		if binding['pressed']:
+			mouse.press(binding['btn'])
+		else:
+			mouse.release(binding['btn'])
+		state['event_rate'].add()
 
 # --- Polling Loop ---
 def polling_loop(start_btn, stop_btn, status_label):
 	"""
 	Main polling loop: handles reconnection, movement, scrolling, clicking.
 	"""
-	prev_states = {}
+	bindings = build_button_bindings()
+	event_rate = state['event_rate']
+	event_rate.reset()
 	js = state['joystick']
 	mouse = state['mouse']
 	while state['is_running']:
@@ -216,7 +249,14 @@ def polling_loop(start_btn, stop_btn, status_label):
 			continue
 		process_mouse_movement(js, mouse)
 		process_scroll(js, mouse)
-		process_button_presses(js, mouse, prev_states)
+		process_button_presses(js, mouse, bindings)
+		# One write (and one SYN_REPORT) per tick for batching backends
+		try:
+			mouse.flush()
+		except Exception as e:
+			print("Error flushing output:", e)
+		if event_rate.tick():
+			status_label.config(text=f"Status: Running ({event_rate.rate:.1f} events/s)")
 		time.sleep(0.01)
 
 	# Cleanup UI state
@@ -307,12 +347,20 @@ def on_close(root):
 	t = state.get('polling_thread')
 	if t and t.is_alive():
 		t.join(timeout=1)
-	pygame.quit()
-	root.destroy()
+	try:
+		# Only close the output once the polling thread has stopped flushing
+		# it; if it is still running, exiting closes the fd and the device
+		if not (t and t.is_alive()):
+			state['mouse'].close()
+	except Exception as e:
+		print("Error closing output:", e)
+	finally:
+		pygame.quit()
+		root.destroy()
 
 try:
 	initial_loading = True
-	state['mouse'] = MouseController()
+	state['mouse'] = open_backend()
 	root, mapping_display, start_btn, stop_btn, status_label = build_ui()
 	initial_loading = False
 	if load_configuration() and messagebox.askyesno("Load Configuration",
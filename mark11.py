@@ -4,16 +4,19 @@ import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pygame
-from pynput import keyboard as pkb, mouse as pm
+from pynput import mouse as pm
+from output_backends import open_backend
+from binding_filter import EventRate, binding_key, binding_value, build_bindings, update_binding
 
 CONFIG_FILE = "controller_to_keyboard_bindings.json"
 
 # --- State ---
 state = {
     "joystick": None,
-    "mappings": {},  # { "input_id": "keyboard_key" }
+    "mappings": {},  # { "input_id": "keyboard_key" } or { "input_id": {"key": ..., "press": ..., "release": ..., "min_hold": ...} }
     "polling": False,
     "keyboard_state": set(),
+    "event_rate": EventRate(),  # injected events per second
 }
 
 # --- Initialize pygame joystick ---
@@ -39,41 +42,35 @@ def save_config():
         json.dump(state["mappings"], f, indent=2)
 
 # --- Keyboard simulation ---
-keyboard_controller = pkb.Controller()
+# Output goes through a backend (uinput on Linux when available, else pynput);
+# pynput's mouse controller is still used to read the cursor while binding.
+output = open_backend()
 mouse_controller = pm.Controller()
 
 def press_key(key):
     try:
-        if key.startswith("mouse_button:"):
-            button_name = key.split(":")[1]
-            button = getattr(pm.Button, button_name, None)
-            if button:
-                mouse_controller.press(button)
-        elif key.startswith("mouse:"):
+        if key.startswith("mouse:"):
             # Mouse direction (simulate movement)
             dx = dy = 0
             if key == "mouse:left": dx = -20
             elif key == "mouse:right": dx = 20
             elif key == "mouse:up": dy = -20
             elif key == "mouse:down": dy = 20
-            mouse_controller.move(dx, dy)
+            output.move(dx, dy)
         else:
-            keyboard_controller.press(key)
+            output.press(key)
+        state["event_rate"].add()
     except Exception as e:
         print("Error pressing key:", key, e)
 
 def release_key(key):
     try:
-        if key.startswith("mouse_button:"):
-            button_name = key.split(":")[1]
-            button = getattr(pm.Button, button_name, None)
-            if button:
-                mouse_controller.release(button)
-        elif key.startswith("mouse:"):
+        if key.startswith("mouse:"):
             # Directional mouse movement doesn't need release
             return
         else:
-            keyboard_controller.release(key)
+            output.release(key)
+        state["event_rate"].add()
     except Exception as e:
         print("Error releasing key:", key, e)
 
@@ -84,7 +81,9 @@ debounce_steps = {}   # input_id: step count for repeated presses
 def polling_loop():
     js = state["joystick"]
     keyboard_state = state["keyboard_state"]
-    mappings = state["mappings"]
+    bindings = build_bindings(state["mappings"], output)
+    event_rate = state["event_rate"]
+    event_rate.reset()
 
     debounce_timers = {}
     debounce_steps = {}
@@ -95,24 +94,13 @@ def polling_loop():
 
     while state["polling"]:
         pygame.event.pump()
-        for input_id, key in mappings.items():
-            parts = input_id.split(":")
-            input_type = parts[0]
-            idx = int(parts[1])
-            pressed = False
-
-            if input_type == "axis":
-                polarity = int(parts[2])
-                val = js.get_axis(idx)
-                threshold = 0.5
-                if polarity > 0:
-                    pressed = val > threshold
-                else:
-                    pressed = val < -threshold
-            elif input_type == "button":
-                pressed = js.get_button(idx) == 1
-            else:
-                continue
+        now = time.monotonic()
+        for binding in bindings:
+            input_id = binding["input_id"]
+            key = binding["key"]
+
+            update_binding(binding, binding_value(binding, js), now)
+            pressed = binding["pressed"]
 
             debounce = debounce_timers.get(input_id, 0)
             step = debounce_steps.get(input_id, 0)
@@ -135,12 +123,19 @@ def polling_loop():
                 debounce_timers[input_id] = 0
                 debounce_steps[input_id] = 0
 
+        # One write (and one SYN_REPORT) per tick for batching backends
+        try:
+            output.flush()
+        except Exception as e:
+            print("Error flushing output:", e)
+        event_rate.tick(now)
         time.sleep(interval)
 
 # --- GUI ---
 class App:
     def __init__(self, root):
         self.root = root
+        self.rate_after_id = None
         root.title("Controller to Keyboard Mapper")
 
         self.js = detect_joystick()
@@ -174,7 +169,7 @@ class App:
     def refresh_listbox(self):
         self.mapping_list.delete(0, tk.END)
         for input_id, key in state["mappings"].items():
-            self.mapping_list.insert(tk.END, f"{input_id} → {key}")
+            self.mapping_list.insert(tk.END, f"{input_id} → {binding_key(key)}")
 
     def add_binding(self):
         # Step 1: Select controller input
@@ -348,11 +343,19 @@ class App:
         self.stop_btn.config(state="normal")
         self.poll_thread = threading.Thread(target=polling_loop, daemon=True)
         self.poll_thread.start()
+        self.rate_after_id = self.root.after(1000, self.show_event_rate)
+
+    def show_event_rate(self):
+        self.status.config(text=f"Mapping started ({state['event_rate'].rate:.1f} events/s)")
+        self.rate_after_id = self.root.after(1000, self.show_event_rate)
 
     def stop_mapping(self):
         if not state["polling"]:
             return
         state["polling"] = False
+        if self.rate_after_id is not None:
+            self.root.after_cancel(self.rate_after_id)
+            self.rate_after_id = None
         self.status.config(text="Mapping stopped")
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
@@ -362,5 +365,16 @@ def main():
     app = App(root)
     root.mainloop()
 
+    # Stop polling and remove the virtual device once the window is gone
+    state["polling"] = False
+    poll_thread = getattr(app, "poll_thread", None)
+    if poll_thread and poll_thread.is_alive():
+        poll_thread.join(timeout=1)
+    if not (poll_thread and poll_thread.is_alive()):
+        try:
+            output.close()
+        except Exception as e:
+            print("Error closing output:", e)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,302 @@
+import os
+import struct
+import sys
+import threading
+import time
+
+# --- Backend selection ---
+# "auto" tries uinput on Linux and falls back to pynput, "uinput" and
+# "pynput" force one or the other.
+OUTPUT_BACKEND = os.environ.get("CONTROLLER_MAPPER_OUTPUT", "auto")
+UINPUT_PATH = "/dev/uinput"
+
+# --- linux/input-event-codes.h ---
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_REL = 0x02
+SYN_REPORT = 0
+REL_X = 0x00
+REL_Y = 0x01
+REL_HWHEEL = 0x06
+REL_WHEEL = 0x08
+BUS_VIRTUAL = 0x06
+
+# Names are the lowercase tkinter keysyms that mark11 stores in its config
+KEY_CODES = {
+    "escape": 1, "minus": 12, "equal": 13, "backspace": 14, "tab": 15,
+    "bracketleft": 26, "bracketright": 27, "return": 28, "control_l": 29,
+    "semicolon": 39, "apostrophe": 40, "grave": 41, "shift_l": 42,
+    "backslash": 43, "comma": 51, "period": 52, "slash": 53, "shift_r": 54,
+    "kp_multiply": 55, "alt_l": 56, "space": 57, "caps_lock": 58,
+    "num_lock": 69, "scroll_lock": 70, "f11": 87, "f12": 88,
+    "control_r": 97, "print": 99, "alt_r": 100, "home": 102, "up": 103,
+    "prior": 104, "left": 105, "right": 106, "end": 107, "down": 108,
+    "next": 109, "insert": 110, "delete": 111, "pause": 119,
+    "super_l": 125, "super_r": 126, "menu": 127,
+}
+KEY_CODES.update({str(n): 2 + (n - 1) % 10 for n in range(10)})
+KEY_CODES.update({f"f{n}": 58 + n for n in range(1, 11)})
+KEY_CODES.update({f"f{n}": 170 + n for n in range(13, 25)})
+for row, first in (("qwertyuiop", 16), ("asdfghjkl", 30), ("zxcvbnm", 44)):
+    KEY_CODES.update({c: first + i for i, c in enumerate(row)})
+# Keypad, with num lock on and off
+KEY_CODES.update({
+    "kp_7": 71, "kp_8": 72, "kp_9": 73, "kp_subtract": 74, "kp_4": 75,
+    "kp_5": 76, "kp_6": 77, "kp_add": 78, "kp_1": 79, "kp_2": 80, "kp_3": 81,
+    "kp_0": 82, "kp_decimal": 83, "kp_enter": 96, "kp_divide": 98,
+    "kp_equal": 117, "kp_home": 71, "kp_up": 72, "kp_prior": 73,
+    "kp_left": 75, "kp_begin": 76, "kp_right": 77, "kp_end": 79,
+    "kp_down": 80, "kp_next": 81, "kp_insert": 82, "kp_delete": 83,
+})
+
+# tkinter keysyms that pynput knows under another name or as a character
+PYNPUT_KEY_NAMES = {
+    "return": "enter", "escape": "esc", "prior": "page_up", "next": "page_down",
+    "control_l": "ctrl_l", "control_r": "ctrl_r", "super_l": "cmd_l",
+    "super_r": "cmd_r", "print": "print_screen", "minus": "-", "equal": "=",
+    "bracketleft": "[", "bracketright": "]", "semicolon": ";",
+    "apostrophe": "'", "grave": "`", "backslash": "\\", "comma": ",",
+    "period": ".", "slash": "/",
+}
+
+# Names match pynput.mouse.Button, as stored by "mouse_button:<name>" bindings.
+# pynput calls the side buttons x1/x2 on Windows and button8/button9 on Linux.
+BUTTON_CODES = {
+    "left": 0x110, "right": 0x111, "middle": 0x112,
+    "x1": 0x113, "x2": 0x114, "button8": 0x113, "button9": 0x114,
+}
+SIDE_BUTTONS = (
+    ("mouse_button:x1", "mouse_button:x2") if sys.platform == "win32"
+    else ("mouse_button:button8", "mouse_button:button9")
+)
+
+# struct input_event: struct timeval, __u16 type, __u16 code, __s32 value.
+# The kernel stamps events itself, so the timeval is left zeroed.
+INPUT_EVENT = struct.Struct("llHHi")
+SYN_EVENT = INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+
+# --- linux/uinput.h ioctls ---
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_DEV_SETUP = 0x405C5503  # _IOW('U', 3, struct uinput_setup)
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_RELBIT = 0x40045566
+UINPUT_SETUP = struct.Struct("HHHH80sI")
+
+
+class PynputBackend:
+    """
+    Sends every event straight through pynput (XTest on Linux, SendInput on Windows).
+    """
+    name = "pynput"
+
+    def __init__(self):
+        from pynput import keyboard as pkb, mouse as pm
+        self._buttons = pm.Button
+        self._keys = pkb.Key
+        self.keyboard = pkb.Controller()
+        self.mouse = pm.Controller()
+
+    def _key(self, key):
+        name = PYNPUT_KEY_NAMES.get(key, key)
+        return name if len(name) == 1 else getattr(self._keys, name, None)
+
+    def supports(self, key):
+        if key.startswith("mouse_button:"):
+            return hasattr(self._buttons, key.split(":")[1])
+        return self._key(key) is not None
+
+    def press(self, key):
+        if key.startswith("mouse_button:"):
+            button = getattr(self._buttons, key.split(":")[1], None)
+            if button:
+                self.mouse.press(button)
+        else:
+            self.keyboard.press(self._key(key) or key)
+
+    def release(self, key):
+        if key.startswith("mouse_button:"):
+            button = getattr(self._buttons, key.split(":")[1], None)
+            if button:
+                self.mouse.release(button)
+        else:
+            self.keyboard.release(self._key(key) or key)
+
+    def move(self, dx, dy):
+        self.mouse.move(dx, dy)
+
+    def scroll(self, dx, dy):
+        self.mouse.scroll(dx, dy)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class UInputBackend:
+    """
+    Queues input_event structs and writes them to a uinput virtual device,
+    one write and one SYN_REPORT per flush().
+
+    Pass an already open file descriptor (a file or pipe) to skip the
+    device setup and capture the raw event stream instead.
+    """
+    name = "uinput"
+
+    def __init__(self, fd=None, path=UINPUT_PATH):
+        self.pending = []
+        self.held = set()
+        self.scroll_remainder = [0.0, 0.0]
+        self.is_device = fd is None
+        if self.is_device:
+            self.fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            try:
+                self._setup_device()
+            except OSError:
+                os.close(self.fd)
+                raise
+        else:
+            self.fd = fd
+
+    def _setup_device(self):
+        import fcntl
+        fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_KEY)
+        fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_REL)
+        for code in list(KEY_CODES.values()) + list(BUTTON_CODES.values()):
+            fcntl.ioctl(self.fd, UI_SET_KEYBIT, code)
+        for code in (REL_X, REL_Y, REL_WHEEL, REL_HWHEEL):
+            fcntl.ioctl(self.fd, UI_SET_RELBIT, code)
+        setup = UINPUT_SETUP.pack(BUS_VIRTUAL, 0x1, 0x1, 1, b"Controller Mapper", 0)
+        fcntl.ioctl(self.fd, UI_DEV_SETUP, setup)
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+
+    def _code(self, key):
+        if key.startswith("mouse_button:"):
+            return BUTTON_CODES.get(key.split(":")[1])
+        return KEY_CODES.get(key.lower())
+
+    def supports(self, key):
+        return self._code(key) is not None
+
+    def _key(self, key):
+        code = self._code(key)
+        if code is None:
+            raise KeyError(f"No uinput key code for {key!r}")
+        return code
+
+    def press(self, key):
+        # The input core drops a second value=1 for a key that is already
+        # down, and libinput discards autorepeat (value=2), so a repeat while
+        # held is sent as its own release/SYN_REPORT before the new press
+        code = self._key(key)
+        if code in self.held:
+            self.pending.append(INPUT_EVENT.pack(0, 0, EV_KEY, code, 0))
+            self.pending.append(SYN_EVENT)
+        self.held.add(code)
+        self.pending.append(INPUT_EVENT.pack(0, 0, EV_KEY, code, 1))
+
+    def release(self, key):
+        code = self._key(key)
+        self.held.discard(code)
+        self.pending.append(INPUT_EVENT.pack(0, 0, EV_KEY, code, 0))
+
+    def move(self, dx, dy):
+        if dx:
+            self.pending.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_X, int(dx)))
+        if dy:
+            self.pending.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_Y, int(dy)))
+
+    def scroll(self, dx, dy):
+        # pynput's scroll(0, 1) is "up", which is a positive REL_WHEEL as well.
+        # Fractional amounts (mark10 scrolls by fractions of a click) are
+        # carried over until they add up to a whole click.
+        for i, (code, amount) in enumerate(((REL_HWHEEL, dx), (REL_WHEEL, dy))):
+            total = self.scroll_remainder[i] + amount
+            clicks = int(total)
+            self.scroll_remainder[i] = total - clicks
+            if clicks:
+                self.pending.append(INPUT_EVENT.pack(0, 0, EV_REL, code, clicks))
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.pending.append(SYN_EVENT)
+        try:
+            os.write(self.fd, b"".join(self.pending))
+        finally:
+            # A failed write (e.g. EAGAIN) drops the batch instead of piling
+            # up repeated SYN_REPORTs on every retry
+            self.pending.clear()
+
+    def close(self):
+        self.flush()
+        if self.is_device:
+            import fcntl
+            try:
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            finally:
+                os.close(self.fd)
+
+
+def open_backend(name=None):
+    name = name or OUTPUT_BACKEND
+    if name == "uinput" or (name == "auto" and sys.platform.startswith("linux")):
+        try:
+            return UInputBackend()
+        except OSError as e:
+            if name == "uinput":
+                raise
+            print("uinput unavailable, falling back to pynput:", e)
+    return PynputBackend()
+
+
+# --- Benchmark: per-event cost of each backend ---
+def _bench(label, backend, events, per_flush):
+    start = time.perf_counter()
+    for i in range(events):
+        backend.move(1 if i % 2 else -1, 0)
+        if i % per_flush == per_flush - 1:
+            backend.flush()
+    backend.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / events * 1e6:8.2f} us/event")
+
+
+def main(events=20000, per_flush=4):
+    # Moves alternate +1/-1 so the pointer ends up where it started
+    with open(os.devnull, "wb") as sink:
+        _bench("uinput (/dev/null)", UInputBackend(fd=sink.fileno()), events, per_flush)
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while os.read(read_fd, 65536):
+            pass
+
+    drain_thread = threading.Thread(target=drain, daemon=True)
+    drain_thread.start()
+    try:
+        _bench("uinput (pipe)", UInputBackend(fd=write_fd), events, per_flush)
+    finally:
+        os.close(write_fd)
+        drain_thread.join(timeout=1)
+        os.close(read_fd)
+    try:
+        device = UInputBackend()
+    except OSError as e:
+        print(f"{'uinput (/dev/uinput)':<28} skipped: {e}")
+    else:
+        _bench("uinput (/dev/uinput)", device, events, per_flush)
+        device.close()
+    try:
+        pynput_backend = PynputBackend()
+    except Exception as e:
+        print(f"{'pynput':<28} skipped: {e}")
+    else:
+        _bench("pynput", pynput_backend, min(events, 2000), per_flush)
+
+
+if __name__ == "__main__":
+    main()
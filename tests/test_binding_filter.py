@@ -0,0 +1,106 @@
+import pytest
+
+from binding_filter import (
+    AXIS_THRESHOLDS, EventRate, binding_key, binding_value, build_bindings,
+    make_binding, update_binding,
+)
+
+
+def axis_binding(**thresholds):
+    return make_binding(dict({"min_hold": 0.0}, **thresholds), AXIS_THRESHOLDS)
+
+
+def test_value_inside_band_keeps_state():
+    binding = axis_binding(press=0.5, release=0.3)
+    assert not update_binding(binding, 0.4, 0.0)
+    assert not binding["pressed"]
+    assert update_binding(binding, 0.6, 0.01)
+    assert not update_binding(binding, 0.4, 0.02)
+    assert binding["pressed"]
+    assert update_binding(binding, 0.2, 0.03)
+    assert not binding["pressed"]
+
+
+def test_flip_shorter_than_min_hold_never_commits():
+    binding = axis_binding(press=0.5, release=0.3, min_hold=0.05)
+    assert not update_binding(binding, 0.9, 0.00)
+    assert binding["pending_since"] == 0.00
+    assert not update_binding(binding, 0.9, 0.02)
+    assert not update_binding(binding, 0.0, 0.04)
+    assert binding["pending_since"] is None
+    assert not update_binding(binding, 0.9, 0.10)
+    assert not binding["pressed"]
+    assert update_binding(binding, 0.9, 0.20)
+    assert binding["pressed"]
+
+
+def test_release_above_press_is_rejected():
+    with pytest.raises(ValueError):
+        axis_binding(press=0.3, release=0.5)
+
+
+class StubJoystick:
+    def __init__(self, axes=(), buttons=()):
+        self.axes = list(axes)
+        self.buttons = list(buttons)
+
+    def get_axis(self, idx):
+        return self.axes[idx]
+
+    def get_button(self, idx):
+        return self.buttons[idx]
+
+
+class StubOutput:
+    name = "stub"
+
+    def supports(self, key):
+        return key != "exclam"
+
+
+def test_negative_polarity_axis_presses_on_negative_values():
+    js = StubJoystick(axes=[0.0, 0.0])
+    (binding,) = build_bindings({"axis:1:-1": "w"}, StubOutput())
+    assert binding["polarity"] == -1
+    binding["min_hold"] = 0.0
+
+    js.axes[1] = 0.8
+    assert not update_binding(binding, binding_value(binding, js), 0.0)
+    js.axes[1] = -0.8
+    assert update_binding(binding, binding_value(binding, js), 0.01)
+    js.axes[1] = -0.4
+    assert not update_binding(binding, binding_value(binding, js), 0.02)
+    assert binding["pressed"]
+    js.axes[1] = -0.1
+    assert update_binding(binding, binding_value(binding, js), 0.03)
+    assert not binding["pressed"]
+
+
+def test_build_bindings_skips_malformed_and_unsupported():
+    mappings = {
+        "axis:0:1": {"key": "a", "press": 0.7, "release": 0.2},
+        "button:1": {"press": 0.5},
+        "button:2": {"key": "b", "press": None},
+        "button:3": None,
+        "axis:4": "c",
+        "button:5": "exclam",
+        "hat:0": "d",
+    }
+    bindings = build_bindings(mappings, StubOutput())
+    assert [(b["input_id"], b["key"], b["press"]) for b in bindings] == [("axis:0:1", "a", 0.7)]
+
+
+@pytest.mark.parametrize("value, shown", [
+    ("w", "w"), ({"key": "w"}, "w"), ({}, "?"), (None, "None"), (5, "5"), (["w"], "['w']"),
+])
+def test_binding_key_shows_any_value(value, shown):
+    assert binding_key(value) == shown
+
+
+def test_event_rate_reset_starts_a_new_window():
+    rate = EventRate(window=1.0)
+    rate.reset(now=100.0)
+    rate.add(50)
+    assert not rate.tick(now=100.5)
+    assert rate.tick(now=101.0)
+    assert rate.rate == pytest.approx(50.0)
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from output_backends import (
+    BUTTON_CODES, EV_KEY, EV_REL, EV_SYN, INPUT_EVENT, KEY_CODES, REL_WHEEL,
+    REL_X, REL_Y, SYN_REPORT, UInputBackend,
+)
+
+
+@pytest.fixture
+def pipe_backend():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    yield UInputBackend(fd=write_fd), read_fd
+    os.close(write_fd)
+    os.close(read_fd)
+
+
+def read_events(read_fd):
+    try:
+        data = os.read(read_fd, 65536)
+    except BlockingIOError:
+        return []
+    size = INPUT_EVENT.size
+    assert len(data) % size == 0
+    return [INPUT_EVENT.unpack(data[i:i + size])[2:] for i in range(0, len(data), size)]
+
+
+def test_flush_writes_one_batch_with_one_syn_report(pipe_backend):
+    backend, read_fd = pipe_backend
+    backend.press("a")
+    backend.press("mouse_button:left")
+    backend.move(-3, 4)
+    backend.flush()
+    assert read_events(read_fd) == [
+        (EV_KEY, KEY_CODES["a"], 1),
+        (EV_KEY, BUTTON_CODES["left"], 1),
+        (EV_REL, REL_X, -3),
+        (EV_REL, REL_Y, 4),
+        (EV_SYN, SYN_REPORT, 0),
+    ]
+    backend.release("mouse_button:left")
+    backend.flush()
+    assert read_events(read_fd) == [
+        (EV_KEY, BUTTON_CODES["left"], 0),
+        (EV_SYN, SYN_REPORT, 0),
+    ]
+
+
+def test_flush_without_events_writes_nothing(pipe_backend):
+    backend, read_fd = pipe_backend
+    backend.move(0, 0)
+    backend.flush()
+    assert read_events(read_fd) == []
+
+
+def test_repeated_press_is_sent_as_release_and_press(pipe_backend):
+    backend, read_fd = pipe_backend
+    backend.press("a")
+    backend.press("a")
+    backend.release("a")
+    backend.flush()
+    a = KEY_CODES["a"]
+    assert read_events(read_fd) == [
+        (EV_KEY, a, 1),
+        (EV_KEY, a, 0),
+        (EV_SYN, SYN_REPORT, 0),
+        (EV_KEY, a, 1),
+        (EV_KEY, a, 0),
+        (EV_SYN, SYN_REPORT, 0),
+    ]
+
+
+def test_fractional_scroll_carries_over(pipe_backend):
+    backend, read_fd = pipe_backend
+    for _ in range(5):
+        backend.scroll(0, 0.3)
+    backend.flush()
+    assert (EV_REL, REL_WHEEL, 1) in read_events(read_fd)
+    assert backend.scroll_remainder[1] == pytest.approx(0.5)
+
+
+def test_failed_write_clears_queue():
+    read_fd, write_fd = os.pipe()
+    os.close(read_fd)
+    backend = UInputBackend(fd=write_fd)
+    backend.move(1, 0)
+    with pytest.raises(OSError):
+        backend.flush()
+    assert backend.pending == []
+    os.close(write_fd)
+
+
+def test_supports_keypad_and_rejects_shifted_keysyms(pipe_backend):
+    backend, _ = pipe_backend
+    assert backend.supports("kp_0")
+    assert backend.supports("kp_add")
+    assert backend.supports("f13")
+    assert backend.supports("mouse_button:x2")
+    assert not backend.supports("exclam")
+    with pytest.raises(KeyError):
+        backend.press("exclam")
+
+
+def test_linux_side_button_names(pipe_backend):
+    backend, read_fd = pipe_backend
+    assert backend.supports("mouse_button:button8")
+    assert backend.supports("mouse_button:button9")
+    backend.press("mouse_button:button8")
+    backend.press("mouse_button:button9")
+    backend.flush()
+    assert read_events(read_fd) == [
+        (EV_KEY, BUTTON_CODES["x1"], 1),
+        (EV_KEY, BUTTON_CODES["x2"], 1),
+        (EV_SYN, SYN_REPORT, 0),
+    ]